@@ -2,11 +2,20 @@
 
 import sys
 import argparse
+from typing import Optional
+from csv_transformer.common.constants import ErrorPolicy, QuotingStyle, ReaderBackend, SamplingMethod
 from csv_transformer.common.logger import logger
 from csv_transformer.common.utils import get_json_from_input
 from csv_transformer.services.csv_transformer_service import CSVTransformerService
+from csv_transformer.services.dry_run_service import format_dry_run_report
 
-def transform_csv(input_file: str, output_file: str, transformations: str) -> bool:
+# Nr. of rows sampled by a dry run, if not set
+DEFAULT_SAMPLE_SIZE = 1000
+
+def transform_csv(input_file: str, output_file: str, transformations: str, error_policy: str = ErrorPolicy.FAIL.value,
+                  max_errors: Optional[int] = None, reject_file: Optional[str] = None,
+                  input_dialect: Optional[dict] = None, output_dialect: Optional[dict] = None,
+                  incremental: bool = False, state_file: Optional[str] = None, reader_backend: str = ReaderBackend.CSV.value) -> bool:
     """
     Transform a CSV file based on specified transformations.
     
@@ -14,6 +23,14 @@ def transform_csv(input_file: str, output_file: str, transformations: str) -> bo
         input_file (str): Path to the input CSV file
         output_file (str): Path to the output CSV file
         transformations: definition of transformation and re-ordering of input csv fields. It can be either a escaped JSON or a JSON file
+        error_policy (str): What to do with rows that fail to be transformed: 'fail', 'skip', 'quarantine' or 'passthrough'
+        max_errors (Optional[int]): Maximum nr. of failed rows tolerated before aborting the run
+        reject_file (Optional[str]): Path to the CSV file where failed rows are quarantined
+        input_dialect (Optional[dict]): csv formatting parameters of the input file. They override the ones in the definition
+        output_dialect (Optional[dict]): csv formatting parameters of the output file. They override the ones in the definition
+        incremental (bool): Transform only the rows appended to the input file since the last run
+        state_file (Optional[str]): Path to the JSON file where the incremental state is persisted
+        reader_backend (str): Backend used to read the input file: 'csv' or 'mmap'
     
     Returns:
         bool: True if transformation was successful, False otherwise
@@ -22,13 +39,21 @@ def transform_csv(input_file: str, output_file: str, transformations: str) -> bo
         payload = {
             'input': input_file,
             'output': output_file,
-            'transformations': transformations
+            'transformations': transformations,
+            'error_policy': error_policy,
+            'max_errors': max_errors,
+            'reject_file': reject_file,
+            'input_dialect': input_dialect,
+            'output_dialect': output_dialect,
+            'incremental': incremental,
+            'state_file': state_file,
+            'reader_backend': reader_backend,
         }
         logger.info(f"Input payload: {payload}")
-        transformations_json = get_json_from_input(transformations)
-        logger.info(f"Transformations definition: {transformations_json}")
+        transformations_json = _load_transformations(transformations, input_dialect, output_dialect)
         
-        service = CSVTransformerService(input_file, output_file)
+        service = CSVTransformerService(input_file, output_file, ErrorPolicy(error_policy), max_errors, reject_file,
+                                        incremental, state_file, ReaderBackend(reader_backend))
         service.transform(transformations_json)
         
         return True
@@ -37,6 +62,72 @@ def transform_csv(input_file: str, output_file: str, transformations: str) -> bo
         return False
 
 
+def dry_run_csv(input_file: str, output_file: str, transformations: str, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                sampling: str = SamplingMethod.FIRST.value, input_dialect: Optional[dict] = None,
+                output_dialect: Optional[dict] = None) -> bool:
+    """
+    Validate the transformations on a sample of the input CSV file, without writing the output file.
+    Prints a preview of the transformed rows and a projection of the run on the whole file.
+    
+    Args:
+        input_file (str): Path to the input CSV file
+        output_file (str): Path to the output CSV file
+        transformations: definition of transformation and re-ordering of input csv fields. It can be either a escaped JSON or a JSON file
+        sample_size (int): Nr. of rows to sample
+        sampling (str): Sample the 'first' rows of the file, or rows at 'random' positions
+        input_dialect (Optional[dict]): csv formatting parameters of the input file. They override the ones in the definition
+        output_dialect (Optional[dict]): csv formatting parameters of the output file. They override the ones in the definition
+    
+    Returns:
+        bool: True if the definition is valid and all the sampled rows were transformed, False otherwise
+    """
+    try:
+        payload = {
+            'input': input_file,
+            'output': output_file,
+            'transformations': transformations,
+            'sample_size': sample_size,
+            'sampling': sampling,
+            'input_dialect': input_dialect,
+            'output_dialect': output_dialect,
+        }
+        logger.info(f"Dry run payload: {payload}")
+        transformations_json = _load_transformations(transformations, input_dialect, output_dialect)
+        
+        service = CSVTransformerService(input_file, output_file)
+        report = service.dry_run(transformations_json, sample_size, SamplingMethod(sampling))
+        print(format_dry_run_report(report))
+        
+        return report.is_valid
+    except Exception as e:
+        logger.error(f"Error: {e}")
+        return False
+
+
+def _load_transformations(transformations: str, input_dialect: Optional[dict], output_dialect: Optional[dict]) -> dict:
+    transformations_json = get_json_from_input(transformations)
+    for dialect_name, dialect_overrides in (('input_dialect', input_dialect), ('output_dialect', output_dialect)):
+        if dialect_overrides:
+            transformations_json[dialect_name] = {**transformations_json.get(dialect_name, {}), **dialect_overrides}
+    logger.info(f"Transformations definition: {transformations_json}")
+    return transformations_json
+
+
+def _unescape(value: str) -> str:
+    """
+    Converts escape sequences passed on the command line (i.e.: '\\t') to the characters they represent.
+    Non-ASCII characters are turned into escape sequences first, so they're left untouched.
+    A lone backslash (i.e.: `--escapechar '\\'`) is not an escape sequence, so it's returned as it is.
+    """
+    if value == "\\":
+        return value
+    return value.encode('latin-1', 'backslashreplace').decode('unicode_escape')
+
+
+def _drop_unset(options: dict) -> dict:
+    return {key: value for key, value in options.items() if value is not None}
+
+
 def main():
     parser = argparse.ArgumentParser(description='CSV transformer. Applies transformations to fields as per definition.')
     parser.add_argument('input', help='Input CSV file')
@@ -54,10 +145,65 @@ def main():
         }
         """
     )
+    parser.add_argument('--on-error', default=ErrorPolicy.FAIL.value, choices=[policy.value for policy in ErrorPolicy],
+        help="What to do with rows that fail to be transformed (default: fail)")
+    parser.add_argument('--max-errors', type=int, default=None,
+        help="Maximum nr. of failed rows tolerated before aborting the run (default: unlimited)")
+    parser.add_argument('--reject-file', default=None,
+        help="CSV file where failed rows are written when --on-error is 'quarantine' (default: <output>_rejected.csv)")
+    
+    parser.add_argument('--delimiter', type=_unescape,
+        help="Field delimiter of the input file, i.e.: ';' or '\\t' (default: ',')")
+    parser.add_argument('--quotechar', type=_unescape,
+        help="Quote character of the input file (default: '\"')")
+    parser.add_argument('--escapechar', type=_unescape,
+        help="Escape character of the input file (default: none)")
+    parser.add_argument('--encoding',
+        help="Encoding of the input file, i.e.: 'latin-1' (default: utf-8)")
+    parser.add_argument('--sniff', action='store_true', default=None,
+        help="Detect delimiter and quote character from a sample of the input file")
+    parser.add_argument('--output-delimiter', type=_unescape,
+        help="Field delimiter of the output file (default: ',')")
+    parser.add_argument('--output-quoting', choices=[style.value for style in QuotingStyle],
+        help="Quoting style of the output file (default: minimal)")
+    parser.add_argument('--output-encoding',
+        help="Encoding of the output file (default: utf-8)")
+    parser.add_argument('--lineterminator', type=_unescape,
+        help="Line terminator of the output file (default: '\\r\\n')")
+    parser.add_argument('--incremental', action='store_true',
+        help="Transform only the rows appended to the input file since the last run, and append them to the output file")
+    parser.add_argument('--state-file', default=None,
+        help="JSON file where the incremental state is persisted (default: <output>_state.json)")
+    parser.add_argument('--reader', default=ReaderBackend.CSV.value, choices=[backend.value for backend in ReaderBackend],
+        help="Backend used to read the input file. 'mmap' memory maps local files and copies untransformed fields without decoding them (default: csv)")
+    parser.add_argument('--dry-run', action='store_true',
+        help="Validate the definition on a sample of the input file, without writing the output file")
+    parser.add_argument('--sample', type=int, default=None,
+        help=f"Nr. of rows sampled by the dry run. Implies --dry-run (default: {DEFAULT_SAMPLE_SIZE})")
+    parser.add_argument('--sample-method', default=SamplingMethod.FIRST.value, choices=[method.value for method in SamplingMethod],
+        help="Sample the first rows of the input file, or rows at random positions (default: first)")
     
     args = parser.parse_args()
     
-    success = transform_csv(args.input, args.output, args.transform)
+    input_dialect = _drop_unset({
+        'delimiter': args.delimiter,
+        'quotechar': args.quotechar,
+        'escapechar': args.escapechar,
+        'encoding': args.encoding,
+        'sniff': args.sniff,
+    })
+    output_dialect = _drop_unset({
+        'delimiter': args.output_delimiter,
+        'quoting': args.output_quoting,
+        'encoding': args.output_encoding,
+        'lineterminator': args.lineterminator,
+    })
+    if args.dry_run or args.sample is not None:
+        success = dry_run_csv(args.input, args.output, args.transform, DEFAULT_SAMPLE_SIZE if args.sample is None else args.sample,
+                              args.sample_method, input_dialect, output_dialect)
+    else:
+        success = transform_csv(args.input, args.output, args.transform, args.on_error, args.max_errors, args.reject_file,
+                                input_dialect, output_dialect, args.incremental, args.state_file, args.reader)
     
     if success:
         return 0
@@ -6,4 +6,40 @@ class TransformersType(Enum):
     """
     UUID_TO_INT = "uuid_to_int"
     FORMAT_DATE = "format_date"
-    REDACT_DATA = "redact_data"
\ No newline at end of file
+    REDACT_DATA = "redact_data"
+
+
+class ErrorPolicy(Enum):
+    """
+    Enum for the strategies that can be applied when a row fails to be transformed.
+    """
+    FAIL = "fail"
+    SKIP = "skip"
+    QUARANTINE = "quarantine"
+    PASSTHROUGH = "passthrough"
+
+
+class QuotingStyle(Enum):
+    """
+    Enum for the quoting styles supported when reading and writing csv files. Maps to the `csv.QUOTE_*` constants.
+    """
+    MINIMAL = "minimal"
+    ALL = "all"
+    NONNUMERIC = "nonnumeric"
+    NONE = "none"
+
+
+class SamplingMethod(Enum):
+    """
+    Enum for the methods used to sample the rows of the input file in dry-run mode.
+    """
+    FIRST = "first"
+    RANDOM = "random"
+
+
+class ReaderBackend(Enum):
+    """
+    Enum for the backends that can be used to read the input csv file.
+    """
+    CSV = "csv"
+    MMAP = "mmap"
@@ -0,0 +1,147 @@
+import os
+import mmap
+import codecs
+from typing import Iterator, List, Optional
+
+from csv_transformer.common.constants import QuotingStyle
+from csv_transformer.common.logger import logger
+from csv_transformer.common.utils import is_ascii_compatible
+from csv_transformer.models.transformer_model import CSVDialect
+
+
+# Quoting styles for which quoted and unquoted fields are parsed in the same way
+SUPPORTED_QUOTING_STYLES = {QuotingStyle.MINIMAL.value, QuotingStyle.ALL.value}
+
+# Size of the chunks in which quote chars are counted
+CHUNK_SIZE = 1024 * 1024
+
+
+class MmapCSVReader:
+    """
+    Reads the records of a local csv file by memory mapping it, and finding record boundaries over the raw bytes.
+    Records are returned as bytes, so that fields which don't need to be transformed are never decoded.
+
+    Records are delimited by line breaks, unless the line break is inside a quoted field.
+
+    Args:
+        file_path (str): Path to the input CSV file
+        dialect (CSVDialect): csv formatting parameters of the input file
+
+    Example:
+        >>> with MmapCSVReader("data/user_sample.csv", CSVDialect()) as reader:
+        ...     for record in reader.records():
+        ...         fields = record.rstrip(b"\\r\\n").split(b",")
+    """
+
+    def __init__(self, file_path: str, dialect: CSVDialect):
+        self._file_path = file_path
+        self._quotechar = dialect.quotechar.encode(dialect.encoding)
+        self._file = None
+        self._mm = b""
+        self.data_start = 0
+
+    @staticmethod
+    def is_supported(input_dialect: CSVDialect, output_dialect: CSVDialect) -> bool:
+        """
+        Checks whether the dialects can be handled over raw bytes. Fields copied as they are to the output file
+        must have the same encoding, which must be ASCII compatible, and no escape character can be used.
+        """
+        if input_dialect.escapechar or output_dialect.escapechar:
+            return False
+        if input_dialect.quoting not in SUPPORTED_QUOTING_STYLES or output_dialect.quoting not in SUPPORTED_QUOTING_STYLES:
+            return False
+        if not is_ascii_compatible(input_dialect.encoding) or not is_ascii_compatible(output_dialect.encoding):
+            return False
+        if codecs.lookup(input_dialect.encoding).name != codecs.lookup(output_dialect.encoding).name:
+            return False
+        return all(len(char.encode(input_dialect.encoding)) == 1 for char in (
+            input_dialect.delimiter, input_dialect.quotechar, output_dialect.delimiter, output_dialect.quotechar
+        ))
+
+    def __enter__(self) -> "MmapCSVReader":
+        self._file = open(self._file_path, 'rb')
+        # empty files can't be memory mapped
+        if os.fstat(self._file.fileno()).st_size:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                self._mm.madvise(mmap.MADV_SEQUENTIAL)
+        self.data_start = self._record_end(0, len(self._mm))
+        return self
+
+    def __exit__(self, *args):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._mm = b""
+        self._file.close()
+
+    def records(self, start: Optional[int] = None, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Yields the records between two offsets, line terminator included.
+
+        Args:
+            start (Optional[int]): Offset of the first record. Defaults to the first record after the header
+            end (Optional[int]): Offset after the last record. Defaults to the end of the file
+        """
+        mm = self._mm
+        find = mm.find
+        quotechar = self._quotechar
+        position = self.data_start if start is None else start
+        end = len(mm) if end is None else end
+        while position < end:
+            line_break = find(b"\n", position, end)
+            stop = end if line_break == -1 else line_break + 1
+            record = mm[position:stop]
+            if quotechar in record:
+                # an odd nr. of quote chars means the record continues on the next line
+                while record.count(quotechar) % 2 and stop < end:
+                    line_break = find(b"\n", stop, end)
+                    stop = end if line_break == -1 else line_break + 1
+                    record = mm[position:stop]
+            yield record
+            position = stop
+
+    def split_points(self, splits: int) -> List[int]:
+        """
+        Splits the data of the file in ranges of about the same size, aligned to the beginning of a record,
+        so that each range can be processed on its own via `records(start, end)`.
+        A line break is a record boundary only if the nr. of quote chars since the previous split point is even,
+        otherwise the split point is moved forward to the next line break, as `records` does.
+
+        Args:
+            splits (int): Nr. of ranges
+
+        Returns:
+            List[int]: Offsets delimiting the ranges, from the first record after the header to the end of the file
+        """
+        if splits <= 0:
+            raise ValueError(f"The nr. of splits must be a positive integer. Provided: {splits}")
+        size = len(self._mm)
+        data_size = size - self.data_start
+        points = [self.data_start]
+        for i in range(1, splits):
+            target = max(self.data_start + data_size * i // splits, points[-1])
+            # the byte before the target tells whether the target is already the beginning of a line
+            line_break = self._mm.find(b"\n", max(target - 1, 0))
+            point = size if line_break == -1 else line_break + 1
+            # the previous split point is the beginning of a record, so an odd nr. of quote chars
+            # since then means the line break is inside a quoted field
+            in_quotes = self._count_quotechars(points[-1], point) % 2
+            while in_quotes and point < size:
+                line_break = self._mm.find(b"\n", point)
+                next_point = size if line_break == -1 else line_break + 1
+                in_quotes ^= self._count_quotechars(point, next_point) % 2
+                point = next_point
+            if point > points[-1] and point < size:
+                points.append(point)
+        points.append(size)
+        logger.info(f"Split points of {self._file_path}: {points}")
+        return points
+
+    def _count_quotechars(self, start: int, end: int) -> int:
+        return sum(self._mm[position:min(position + CHUNK_SIZE, end)].count(self._quotechar)
+                   for position in range(start, end, CHUNK_SIZE))
+
+    def _record_end(self, start: int, end: int) -> int:
+        for record in self.records(start, end):
+            return start + len(record)
+        return start
@@ -1,7 +1,14 @@
-from typing import Dict
-from csv_transformer.models.transformer_model import Transformation, TransformerDefinition
+from dataclasses import fields
+from typing import Dict, List, Optional
+from csv_transformer.models.transformer_model import CSVDialect, Transformation, TransformerDefinition
+from csv_transformer.common.constants import QuotingStyle
 from csv_transformer.common.logger import logger
 
+
+# Quoting styles the input file can be read with: 'nonnumeric' would make the reader convert unquoted fields to float
+INPUT_QUOTING_STYLES = [QuotingStyle.MINIMAL, QuotingStyle.ALL, QuotingStyle.NONE]
+
+
 class TransformerArgsParser:
     
     @staticmethod
@@ -21,7 +28,9 @@ class TransformerArgsParser:
                 "transformer_args": <JSON object with input args>
                 }]
             },
-            "column_order": [<column_name>, ...]
+            "column_order": [<column_name>, ...],
+            "input_dialect": {<csv formatting parameters>},
+            "output_dialect": {<csv formatting parameters>}
         }
         ```
             
@@ -51,10 +60,62 @@ class TransformerArgsParser:
                 ))
             transformers_dict[transfomer_name] = column_transformations
             
+        # Build "input_dialect" and "output_dialect" attributes
+        input_dialect = TransformerArgsParser.parse_dialect(transformation_definition.get("input_dialect"), "input_dialect", INPUT_QUOTING_STYLES)
+        output_dialect = TransformerArgsParser.parse_dialect(transformation_definition.get("output_dialect"), "output_dialect")
+
         # Build "transformation" object
         transfomation_object = Transformation(
             transformers=transformers_dict,
             column_order=column_order,
+            input_dialect=input_dialect,
+            output_dialect=output_dialect,
         )
         logger.info("Deserializtion completed successfully")
-        return transfomation_object
\ No newline at end of file
+        return transfomation_object
+
+
+    @staticmethod
+    def parse_dialect(dialect_definition: Optional[dict], argument_name: str = "dialect",
+                      quoting_styles: Optional[List[QuotingStyle]] = None) -> CSVDialect:
+        """
+        Parses the dictionary that holds the csv formatting parameters into a CSVDialect object.
+        Missing parameters are set to their default value.
+
+        Args:
+            dialect_definition (Optional[dict]): csv formatting parameters
+            argument_name (str): name of the argument being parsed, used in error messages
+            quoting_styles (Optional[List[QuotingStyle]]): allowed quoting styles. Defaults to all of them
+
+        Example:
+        ```
+        {
+            "delimiter": ";",
+            "quotechar": "\"",
+            "escapechar": null,
+            "quoting": "minimal",
+            "lineterminator": "\r\n",
+            "encoding": "utf-8",
+            "sniff": false
+        }
+        ```
+
+        Returns:
+            CSVDialect: csv formatting parameters
+        """
+        if not dialect_definition:
+            return CSVDialect()
+        if not isinstance(dialect_definition, dict):
+            raise ValueError(f"If '{argument_name}' is defined, it must be a valid JSON object")
+
+        allowed_keys = {field.name for field in fields(CSVDialect)}
+        unknown_keys = set(dialect_definition) - allowed_keys
+        if unknown_keys:
+            raise ValueError(f"Unknown '{argument_name}' parameters: {sorted(unknown_keys)}. Allowed: {sorted(allowed_keys)}")
+
+        quoting_styles = quoting_styles or list(QuotingStyle)
+        quoting = dialect_definition.get("quoting", QuotingStyle.MINIMAL.value)
+        if quoting not in [style.value for style in quoting_styles]:
+            raise ValueError(f"'{argument_name}.quoting' must be one of {[style.value for style in quoting_styles]}. Provided: {quoting}")
+
+        return CSVDialect(**dialect_definition)
@@ -1,8 +1,26 @@
+import csv
 import json
-from typing import List
+from dataclasses import replace
+from typing import List, Optional
 from pathlib import Path
-from csv import DictReader
+from csv import DictReader, Sniffer
+from csv_transformer.common.constants import QuotingStyle
 from csv_transformer.common.logger import logger
+from csv_transformer.models.transformer_model import CSVDialect
+
+
+# Mapping between the quoting style names used in the definition and the csv module constants
+QUOTING_STYLES = {
+    QuotingStyle.MINIMAL: csv.QUOTE_MINIMAL,
+    QuotingStyle.ALL: csv.QUOTE_ALL,
+    QuotingStyle.NONNUMERIC: csv.QUOTE_NONNUMERIC,
+    QuotingStyle.NONE: csv.QUOTE_NONE,
+}
+
+# Size of the input file prefix used to detect the csv dialect
+SNIFF_SAMPLE_SIZE = 64 * 1024
+# Delimiters considered when detecting the csv dialect
+SNIFF_DELIMITERS = ",;\t|"
 
 
 def validate_json_file_path(arg: str) -> bool:
@@ -63,12 +81,82 @@ def get_json_from_input(transform_argument: str) -> str:
         raise ValueError("The transformation definition is not a proper JSON object", e)
 
        
-def get_csv_field_names(input_file_path: str) -> List[str]:
+def get_csv_format_params(dialect: CSVDialect) -> dict:
+    """
+    Converts a CSVDialect into the formatting parameters accepted by csv readers and writers.
+
+    Args:
+        dialect (CSVDialect): csv formatting parameters
+
+    Returns:
+        dict: keyword arguments for `csv.DictReader` and `csv.DictWriter`
+    """
+    return {
+        "delimiter": dialect.delimiter,
+        "quotechar": dialect.quotechar,
+        "escapechar": dialect.escapechar,
+        "quoting": QUOTING_STYLES[QuotingStyle(dialect.quoting)],
+        "lineterminator": dialect.lineterminator,
+    }
+
+
+def is_ascii_compatible(encoding: str) -> bool:
+    """
+    Checks whether the encoding represents ASCII chars (delimiters, quotes, line breaks) as single ASCII bytes,
+    so that a file in that encoding can be split on raw bytes.
+
+    Example:
+        >>> is_ascii_compatible("latin-1")
+        True
+        >>> is_ascii_compatible("utf-16")
+        False
+    """
+    try:
+        return 'a,;\t|"\r\n'.encode(encoding) == b'a,;\t|"\r\n'
+    except (LookupError, UnicodeEncodeError):
+        return False
+
+
+def sniff_csv_dialect(input_file_path: str, dialect: CSVDialect, sample_size: int = SNIFF_SAMPLE_SIZE) -> CSVDialect:
+    """
+    Detects delimiter and quoting characters of a CSV file from a sample of its first bytes.
+    The sample is truncated to the last complete line so that a partial record doesn't affect the detection.
+
+    Args:
+        input_file_path (str): Path to the CSV file to sample
+        dialect (CSVDialect): csv formatting parameters used as a fallback if the dialect can't be detected
+        sample_size (int): Nr. of characters to sample from the beginning of the file
+
+    Returns:
+        CSVDialect: csv formatting parameters with the detected delimiter and quoting characters
+    """
+    with open(input_file_path, 'r', newline='', encoding=dialect.encoding) as csv_file:
+        sample = csv_file.read(sample_size)
+    if len(sample) == sample_size and "\n" in sample:
+        sample = sample[:sample.rindex("\n") + 1]
+
+    try:
+        sniffed = Sniffer().sniff(sample, delimiters=SNIFF_DELIMITERS)
+    except csv.Error as e:
+        logger.warning(f"Could not detect the dialect of {input_file_path}: {e}. Using the configured one")
+        return dialect
+
+    logger.info(f"Detected dialect of {input_file_path}: delimiter={sniffed.delimiter!r}, quotechar={sniffed.quotechar!r}")
+    return replace(
+        dialect,
+        delimiter=sniffed.delimiter,
+        quotechar=sniffed.quotechar or dialect.quotechar,
+        escapechar=sniffed.escapechar or dialect.escapechar,
+    )
+
+
+def get_csv_field_names(input_file_path: str, dialect: Optional[CSVDialect] = None) -> List[str]:
     """
     Gets the field names (column headers) from a CSV file.
 
     Args:
         input_file_path (str): Path to the CSV file to read headers from
+        dialect (Optional[CSVDialect]): csv formatting parameters of the file. Defaults to a comma separated UTF-8 file
 
     Returns:
         List[str]: List of field names from the CSV header row
@@ -77,10 +165,11 @@ def get_csv_field_names(input_file_path: str) -> List[str]:
         ValueError: If the input file path is invalid or file does not exist
 
     """
+    dialect = dialect or CSVDialect()
     file_path = Path(input_file_path)
     if file_path.is_file():
-        with open(input_file_path, 'r', newline='') as csv_file:
-            reader = DictReader(csv_file)
+        with open(input_file_path, 'r', newline='', encoding=dialect.encoding) as csv_file:
+            reader = DictReader(csv_file, **get_csv_format_params(dialect))
             return reader.fieldnames
     else:
         ValueError(f"The input file path is invalid: {input_file_path}")
@@ -0,0 +1,24 @@
+from typing import List, Dict
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class DryRunReport:
+    """
+    Outcome of a dry run: result of the transformation of a sample of rows,
+    and projection of the run on the whole input file.
+    """
+    sampled_rows: int
+    failed_rows: int
+    rows_per_second: float
+    estimated_rows: int
+    estimated_duration_seconds: float
+    estimated_output_size: int
+    column_errors: Dict[str, int] = field(default_factory=dict)
+    first_errors: Dict[str, str] = field(default_factory=dict)
+    unknown_columns: List[str] = field(default_factory=list)
+    preview: str = ""
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.failed_rows and not self.unknown_columns
@@ -11,11 +11,29 @@ These models implements the structure of the transformation definition:
       "transformer_args": <JSON object with input args>
     }]
   },
-  "column_order": [<column_name>, ...]
+  "column_order": [<column_name>, ...],
+  "input_dialect": {<csv formatting parameters>},
+  "output_dialect": {<csv formatting parameters>}
 }
 """
 
 
+@dataclass(frozen=True)
+class CSVDialect:
+    """
+    Formatting parameters used to read or write a csv file.
+    When 'sniff' is True the input dialect is detected from a sample of the input file,
+    the other attributes are used as a fallback.
+    """
+    delimiter: str = ","
+    quotechar: str = '"'
+    escapechar: Optional[str] = None
+    quoting: str = "minimal"
+    lineterminator: str = "\r\n"
+    encoding: str = "utf-8"
+    sniff: bool = False
+
+
 @dataclass(frozen=True)
 class TransformerDefinition:
     column_name: str
@@ -30,4 +48,6 @@ class TransformerDefinition:
 @dataclass(frozen=True)
 class Transformation:
     transformers: Dict[str, List[TransformerDefinition]]
-    column_order: Optional[List[str]] = None
\ No newline at end of file
+    column_order: Optional[List[str]] = None
+    input_dialect: CSVDialect = CSVDialect()
+    output_dialect: CSVDialect = CSVDialect()
\ No newline at end of file
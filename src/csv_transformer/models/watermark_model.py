@@ -0,0 +1,28 @@
+from typing import List, Dict
+from dataclasses import dataclass, field
+
+"""
+This model implements the structure of the state file persisted by incremental runs:
+{
+  "offset": <nr. of bytes of the input file already processed>,
+  "prefix_hash": <sha256 of the processed bytes>,
+  "line_count": <nr. of lines of the input file already processed>,
+  "output_size": <nr. of bytes of the output file written so far>,
+  "definition_hash": <sha256 of the transformation definition>,
+  "field_names": [<column_name>, ...],
+  "transformers_state": {
+    "<column_name>": <JSON object with the transformer state>
+  }
+}
+"""
+
+
+@dataclass(frozen=True)
+class Watermark:
+    offset: int
+    prefix_hash: str
+    line_count: int
+    output_size: int
+    definition_hash: str
+    field_names: List[str]
+    transformers_state: Dict[str, dict] = field(default_factory=dict)
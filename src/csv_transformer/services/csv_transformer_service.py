@@ -1,11 +1,31 @@
-from typing import Dict, List
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
 from csv import DictReader, DictWriter
 
+from csv_transformer.common.constants import ErrorPolicy, ReaderBackend, SamplingMethod
+from csv_transformer.common.mmap_reader import MmapCSVReader
 from csv_transformer.common.parsers import TransformerArgsParser
-from csv_transformer.models.transformer_model import Transformation
+from csv_transformer.models.transformer_model import CSVDialect, Transformation
 from csv_transformer.services.dataset_transformer_service import DatasetTransformerService
+from csv_transformer.models.dry_run_model import DryRunReport
+from csv_transformer.models.watermark_model import Watermark
+from csv_transformer.services.dry_run_service import DryRunService
+from csv_transformer.services.error_handler_service import ErrorHandlerService, get_default_reject_file_path
+from csv_transformer.services.incremental_state_service import (
+    IncrementalStateService,
+    find_last_record_end,
+    get_default_state_file_path,
+    get_definition_hash,
+)
+from csv_transformer.services.mmap_transformer_service import MmapTransformerService
 from csv_transformer.common.logger import logger
-from csv_transformer.common.utils import get_csv_field_names, is_a_valid_csv_file_path
+from csv_transformer.common.utils import (
+    get_csv_field_names,
+    get_csv_format_params,
+    is_a_valid_csv_file_path,
+    is_ascii_compatible,
+    sniff_csv_dialect,
+)
 
 
 def validate_csv_file_path(csv_file_path: str, file_must_exist: bool = True):
@@ -13,22 +33,50 @@ def validate_csv_file_path(csv_file_path: str, file_must_exist: bool = True):
         raise ValueError(f"The path is not valid: {csv_file_path}")
 
 
+def _read_lines(binary_file, size: int, encoding: str, hasher) -> Iterator[str]:
+    """Yields the decoded lines of the next `size` bytes of a binary file, updating the hasher with the bytes read.
+    `size` must end on a line break, so that lines are never split.
+    """
+    for line in binary_file:
+        if size <= 0:
+            break
+        size -= len(line)
+        hasher.update(line)
+        yield line.decode(encoding)
+
+
 class CSVTransformerService():
     """Service for transforming CSV files based on defined transformations.
     """
 
-    def __init__(self, input_file: str, output_file: str):
+    def __init__(self, input_file: str, output_file: str, error_policy: ErrorPolicy = ErrorPolicy.FAIL,
+                 max_errors: Optional[int] = None, reject_file: Optional[str] = None,
+                 incremental: bool = False, state_file: Optional[str] = None,
+                 reader_backend: ReaderBackend = ReaderBackend.CSV):
         """Initialize the CSV transformer service.
 
         Args:
             input_file (str): Path to the input CSV file
             output_file (str): Path where the transformed CSV will be written
+            error_policy (ErrorPolicy): What to do with rows that fail to be transformed. Defaults to ErrorPolicy.FAIL
+            max_errors (Optional[int]): Maximum nr. of failed rows tolerated before aborting. Unlimited if None
+            reject_file (Optional[str]): Path of the reject CSV file. Defaults to '<output>_rejected.csv'
+            incremental (bool): Transform only the data appended to the input file since the last run
+            state_file (Optional[str]): Path of the JSON file holding the incremental state. Defaults to '<output>_state.json'
+            reader_backend (ReaderBackend): Backend used to read the input file. Defaults to ReaderBackend.CSV
         """
         validate_csv_file_path(input_file)
         validate_csv_file_path(output_file, False)
+        if error_policy == ErrorPolicy.QUARANTINE:
+            reject_file = reject_file or get_default_reject_file_path(output_file)
+            validate_csv_file_path(reject_file, False)
         self._input_file = input_file
         self._output_file = output_file
-        self._field_names = get_csv_field_names(input_file)
+        self._error_handler = ErrorHandlerService(error_policy, max_errors, reject_file)
+        self._reader_backend = reader_backend
+        self._state_service = None
+        if incremental:
+            self._state_service = IncrementalStateService(state_file or get_default_state_file_path(output_file))
 
 
     def transform(self, transformations_definition: dict):
@@ -41,17 +89,18 @@ class CSVTransformerService():
             RuntimeError: If an error occurs during CSV processing
         """
         logger.info(f"Start processing file {self._input_file}")
-        parser = TransformerArgsParser()
-        transformations: Transformation = parser.parse(transformations_definition)
-        dataset_transfomer = DatasetTransformerService(self._field_names, transformations.transformers)
-        column_order = self._field_names if not transformations.column_order else transformations.column_order
-        if set(self._field_names) != set(column_order):
-            raise ValueError(f"All column to be re-ordered must be listed. Provided: {column_order}")
+        transformations, input_dialect, dataset_transfomer, column_order = self._prepare(transformations_definition)
         
         try:
-            transformations.transformers
-            output_rows = self._transform_input_file(dataset_transfomer)
-            self._write_transformation_output(output_rows, column_order)
+            if self._state_service:
+                self._transform_incremental(transformations_definition, dataset_transfomer, column_order,
+                                            input_dialect, transformations.output_dialect)
+            elif self._use_mmap_reader(input_dialect, transformations.output_dialect):
+                mmap_transformer = MmapTransformerService(self._input_file, self._output_file, self._field_names, self._error_handler)
+                mmap_transformer.transform(dataset_transfomer, column_order, input_dialect, transformations.output_dialect)
+            else:
+                output_rows = self._transform_input_file(dataset_transfomer, input_dialect)
+                self._write_transformation_output(output_rows, column_order, transformations.output_dialect)
             
         except Exception as e:
             logger.error(f"Error while processing the input CSV: {e}")
@@ -59,47 +108,187 @@ class CSVTransformerService():
     
     
 
-    def _transform_input_file(self, dataset_transfomer: DatasetTransformerService) -> List[Dict[str, str]]:
+    def dry_run(self, transformations_definition: dict, sample_size: int,
+                sampling: SamplingMethod = SamplingMethod.FIRST) -> DryRunReport:
+        """Validate the transformers definition on a sample of the input file, without writing the output file.
+        
+        Args:
+            transformers_definition (dict): Dictionary containing the transformation rules
+            sample_size (int): Nr. of rows to sample
+            sampling (SamplingMethod): Sample the first rows of the file, or rows at random positions
+            
+        Returns:
+            DryRunReport: Errors found in the sample and projection of the run on the whole file
+        """
+        logger.info(f"Start dry run of file {self._input_file}")
+        transformations, input_dialect, dataset_transfomer, column_order = self._prepare(transformations_definition)
+        dry_run_service = DryRunService(self._input_file, self._field_names, column_order,
+                                        input_dialect, transformations.output_dialect)
+        return dry_run_service.run(dataset_transfomer, sample_size, sampling)
+
+
+    def _prepare(self, transformations_definition: dict) -> Tuple[Transformation, CSVDialect, DatasetTransformerService, List[str]]:
+        """Parse the transformers definition and validate it against the header of the input file.
+        
+        Args:
+            transformers_definition (dict): Dictionary containing the transformation rules
+            
+        Returns:
+            Tuple[Transformation, CSVDialect, DatasetTransformerService, List[str]]: the parsed definition,
+            the csv formatting parameters of the input file, the service to transform individual rows and the output column order
+            
+        Raises:
+            ValueError: If the definition is not valid
+        """
+        parser = TransformerArgsParser()
+        transformations: Transformation = parser.parse(transformations_definition)
+        input_dialect = transformations.input_dialect
+        if input_dialect.sniff:
+            input_dialect = sniff_csv_dialect(self._input_file, input_dialect)
+        self._field_names = get_csv_field_names(self._input_file, input_dialect)
+        dataset_transfomer = DatasetTransformerService(self._field_names, transformations.transformers)
+        column_order = self._field_names if not transformations.column_order else transformations.column_order
+        if set(self._field_names) != set(column_order):
+            raise ValueError(f"All column to be re-ordered must be listed. Provided: {column_order}")
+        return transformations, input_dialect, dataset_transfomer, column_order
+
+
+    def _use_mmap_reader(self, input_dialect: CSVDialect, output_dialect: CSVDialect) -> bool:
+        if self._reader_backend != ReaderBackend.MMAP:
+            return False
+        if not MmapCSVReader.is_supported(input_dialect, output_dialect):
+            logger.warning("The mmap reader doesn't support the csv dialects in use. Falling back to the csv reader")
+            return False
+        return True
+
+
+    def _transform_incremental(self, transformations_definition: dict, dataset_transfomer: DatasetTransformerService,
+                               column_order: List[str], input_dialect: CSVDialect, output_dialect: CSVDialect):
+        """Transform only the data appended to the input file since the last run, and append it to the output file.
+        Falls back to a full run if the previous state can't be resumed.
+        
+        Args:
+            transformations_definition (dict): Dictionary containing the transformation rules
+            dataset_transfomer (DatasetTransformerService): Service to transform individual rows
+            column_order (List[str]): Field names in the order they must be written
+            input_dialect (CSVDialect): csv formatting parameters of the input file
+            output_dialect (CSVDialect): csv formatting parameters of the output file
+
+        Raises:
+            ValueError: If the input encoding is not ASCII compatible, as the input is split on raw line breaks
+        """
+        if not is_ascii_compatible(input_dialect.encoding):
+            raise ValueError(f"Incremental runs require an ASCII compatible input encoding (i.e.: utf-8, latin-1). Provided: {input_dialect.encoding}")
+        definition_hash = get_definition_hash(transformations_definition)
+        watermark, prefix_hasher = self._state_service.resume(self._input_file, self._output_file, definition_hash, self._field_names)
+        start_offset, line_count = 0, 0
+        if watermark:
+            start_offset, line_count = watermark.offset, watermark.line_count
+            dataset_transfomer.set_state(watermark.transformers_state)
+        end_offset = find_last_record_end(self._input_file, start_offset, input_dialect.quotechar.encode(input_dialect.encoding))
+        pending_bytes = os.path.getsize(self._input_file) - end_offset
+        if pending_bytes:
+            logger.warning(f"The last {pending_bytes} bytes of {self._input_file} don't end with a line break, "
+                           "so they're considered still being written and left to the next run")
+
+        logger.info(f"Reading file: {self._input_file} from offset {start_offset} to {end_offset}")
+        with open(self._input_file, 'rb') as binary_file:
+            binary_file.seek(start_offset)
+            lines = _read_lines(binary_file, end_offset - start_offset, input_dialect.encoding, prefix_hasher)
+            # the header is only part of the data read by a full run
+            field_names = self._field_names if watermark else None
+            reader = DictReader(lines, fieldnames=field_names, **get_csv_format_params(input_dialect))
+            output_rows, lines_read = self._transform_rows(reader, dataset_transfomer, input_dialect, line_count,
+                                                           append_rejected=watermark is not None)
+
+        self._write_transformation_output(output_rows, column_order, output_dialect, append=watermark is not None)
+        if not end_offset:
+            # the next run must read the header again
+            logger.warning(f"The header of {self._input_file} is not complete yet. The state is not saved")
+            return
+        self._state_service.save(Watermark(
+            offset=end_offset,
+            prefix_hash=prefix_hasher.hexdigest(),
+            line_count=line_count + lines_read,
+            output_size=os.path.getsize(self._output_file),
+            definition_hash=definition_hash,
+            field_names=list(self._field_names),
+            transformers_state=dataset_transfomer.get_state(),
+        ))
+
+
+    def _transform_input_file(self, dataset_transfomer: DatasetTransformerService, dialect: CSVDialect) -> List[Dict[str, str]]:
         """Transform each row in the input CSV file using the dataset transformer.
         
         Args:
             dataset_transfomer (DatasetTransformerService): Service to transform individual rows
+            dialect (CSVDialect): csv formatting parameters of the input file
             
         Returns:
             List[Dict[str]]: List of transformed rows as dictionaries
             
         """
         logger.info(f"Reading file: {self._input_file}")
+        with open(self._input_file, 'r', newline='', encoding=dialect.encoding) as csv_file:
+            reader = DictReader(csv_file, **get_csv_format_params(dialect))
+            output_rows, _ = self._transform_rows(reader, dataset_transfomer, dialect)
+        return output_rows
+
+
+    def _transform_rows(self, reader: DictReader, dataset_transfomer: DatasetTransformerService, dialect: CSVDialect,
+                        first_line: int = 0, append_rejected: bool = False) -> Tuple[List[Dict[str, str]], int]:
+        """Transform each row read from the reader, applying the error policy to the rows that fail.
+        
+        Args:
+            reader (DictReader): Reader of the input rows
+            dataset_transfomer (DatasetTransformerService): Service to transform individual rows
+            dialect (CSVDialect): csv formatting parameters of the input file
+            first_line (int): Nr. of lines of the input file preceding the data read by the reader
+            append_rejected (bool): Append the quarantined rows to the existing reject file
+            
+        Returns:
+            Tuple[List[Dict[str]], int]: List of transformed rows as dictionaries and nr. of lines read
+            
+        """
         try:
-            with open(self._input_file, 'r', newline='') as csv_file:
-                reader = DictReader(csv_file)
-                
-                logger.info("Applying transformation")
-                output_rows = []
+            logger.info("Applying transformation")
+            output_rows = []
+            transform_row = dataset_transfomer.transform_row
+            with self._error_handler.open(self._field_names, dialect, append_rejected):
+                # Only the transformation is guarded: errors raised by the reader itself (i.e.: malformed
+                # CSV or undecodable bytes) can't be attributed to a single row, and abort the run.
                 for row in reader:
-                    new_row = dataset_transfomer.transform_row(row)
-                    output_rows.append(new_row)
-                
-            logger.info(f"{len(output_rows)} rows processed correctly")
-            return output_rows
+                    try:
+                        output_rows.append(transform_row(row))
+                    except Exception as e:
+                        handled_row = self._error_handler.handle(row, first_line + reader.line_num, e)
+                        if handled_row is not None:
+                            output_rows.append(handled_row)
+            
+            logger.info(f"{len(output_rows)} rows processed, {self._error_handler.error_count} rows failed")
+            return output_rows, reader.line_num
         except Exception as e:
             logger.error(f"Error while reading or transforming the input CSV file: {e}")
             raise
         
             
 
-    def _write_transformation_output(self, rows: List[Dict[str, str]], reordered_fields):
+    def _write_transformation_output(self, rows: List[Dict[str, str]], reordered_fields, dialect: CSVDialect, append: bool = False):
         """Write the transformed rows to the output CSV file.
         
         Args:
             rows (List[Dict[str]]): List of transformed rows to write
+            reordered_fields (List[str]): Field names in the order they must be written
+            dialect (CSVDialect): csv formatting parameters of the output file
+            append (bool): Append the rows to the existing output file, without writing the header
             
         """
         try:
             logger.info(f"Writing output file {self._output_file} with transformed data")
-            with open(self._output_file, 'w') as output_csv:
-                writer = DictWriter(output_csv, fieldnames=reordered_fields)
-                writer.writeheader()
+            with open(self._output_file, 'a' if append else 'w', newline='', encoding=dialect.encoding) as output_csv:
+                writer = DictWriter(output_csv, fieldnames=reordered_fields, **get_csv_format_params(dialect))
+                if not append:
+                    writer.writeheader()
                 writer.writerows(rows)
             logger.info("File created correctly")
         except Exception as e:
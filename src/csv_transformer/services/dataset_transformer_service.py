@@ -38,3 +38,22 @@ class DatasetTransformerService:
                 new_row[field] = row[field]
                 
         return new_row
+
+
+    @property
+    def transformed_fields(self) -> List[str]:
+        return list(self._fields_transformer_map)
+
+
+    def transform_field(self, field: str, value: str) -> str:
+        return self._fields_transformer_map[field].transform(value)
+
+
+    def get_state(self) -> Dict[str, dict]:
+        return {field: transformer.get_state() for field, transformer in self._fields_transformer_map.items()}
+
+
+    def set_state(self, state: Dict[str, dict]):
+        for field, transformer_state in state.items():
+            if field in self._fields_transformer_map:
+                self._fields_transformer_map[field].set_state(transformer_state)
@@ -0,0 +1,251 @@
+import io
+import os
+import codecs
+import time
+import random
+from csv import DictReader, DictWriter
+from itertools import islice
+from typing import Dict, List, Tuple
+
+from csv_transformer.common.constants import SamplingMethod
+from csv_transformer.common.logger import logger
+from csv_transformer.common.utils import get_csv_format_params, is_ascii_compatible
+from csv_transformer.models.dry_run_model import DryRunReport
+from csv_transformer.models.transformer_model import CSVDialect
+from csv_transformer.services.dataset_transformer_service import DatasetTransformerService
+
+
+# Nr. of transformed rows shown in the preview
+PREVIEW_ROWS = 5
+
+
+class _LineReader:
+    """Iterates over the lines of a text file, counting the bytes they take in the file.
+    Lines are encoded again to be measured, as the position of a text file can't be read while iterating.
+    """
+
+    def __init__(self, text_file, encoding: str):
+        self._text_file = text_file
+        self._encoder = codecs.getincrementalencoder(encoding)()
+        self.bytes_read = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = self._text_file.readline()
+        if not line:
+            raise StopIteration
+        self.bytes_read += len(self._encoder.encode(line))
+        return line
+
+
+class DryRunService:
+    """Service that validates a transformation definition on a sample of the input file,
+    and projects throughput and output size of the run on the whole file.
+
+    Args:
+        input_file (str): Path to the input CSV file
+        field_names (List[str]): Field names of the input file
+        column_order (List[str]): Field names in the order they'd be written to the output file
+        input_dialect (CSVDialect): csv formatting parameters of the input file
+        output_dialect (CSVDialect): csv formatting parameters of the output file
+    """
+
+    def __init__(self, input_file: str, field_names: List[str], column_order: List[str],
+                 input_dialect: CSVDialect, output_dialect: CSVDialect):
+        self._input_file = input_file
+        self._field_names = field_names
+        self._column_order = column_order
+        self._input_dialect = input_dialect
+        self._output_dialect = output_dialect
+
+
+    def run(self, dataset_transfomer: DatasetTransformerService, sample_size: int,
+            sampling: SamplingMethod = SamplingMethod.FIRST) -> DryRunReport:
+        """Transforms a sample of rows of the input file, without writing the output file.
+
+        Args:
+            dataset_transfomer (DatasetTransformerService): Service to transform individual rows
+            sample_size (int): Nr. of rows to sample
+            sampling (SamplingMethod): Sample the first rows of the file, or rows at random positions
+
+        Returns:
+            DryRunReport: Errors found in the sample and projection of the run on the whole file.
+            The throughput covers reading, transforming and formatting the sampled rows
+
+        Raises:
+            ValueError: If the sample size is not positive, or the sampling is random and the input
+            encoding is not ASCII compatible
+        """
+        if sample_size <= 0:
+            raise ValueError(f"The sample size must be a positive integer. Provided: {sample_size}")
+        if sampling == SamplingMethod.RANDOM and not is_ascii_compatible(self._input_dialect.encoding):
+            raise ValueError(f"Random sampling requires an ASCII compatible input encoding (i.e.: utf-8, latin-1). "
+                             f"Provided: {self._input_dialect.encoding}")
+
+        logger.info(f"Sampling {sample_size} rows of {self._input_file} ({sampling.value})")
+        start = time.perf_counter()
+        if sampling == SamplingMethod.RANDOM:
+            rows, estimated_rows = self._sample_random_rows(sample_size)
+        else:
+            rows, estimated_rows = self._sample_first_rows(sample_size)
+        elapsed = time.perf_counter() - start
+
+        output_rows = []
+        column_errors: Dict[str, int] = {}
+        first_errors: Dict[str, str] = {}
+        failed_rows = 0
+        for row in rows:
+            start = time.perf_counter()
+            try:
+                output_rows.append(dataset_transfomer.transform_row(row))
+                elapsed += time.perf_counter() - start
+            except Exception:
+                elapsed += time.perf_counter() - start
+                failed_rows += 1
+                # transform each field on its own (not timed, as a real run wouldn't), to report all the columns failing on this row
+                for field in dataset_transfomer.transformed_fields:
+                    if field not in row:
+                        continue
+                    try:
+                        dataset_transfomer.transform_field(field, row[field])
+                    except Exception as e:
+                        column_errors[field] = column_errors.get(field, 0) + 1
+                        first_errors.setdefault(field, f"{e} (value: {row[field]!r})")
+
+        start = time.perf_counter()
+        header, average_output_row_size = self._measure_output(output_rows)
+        elapsed += time.perf_counter() - start
+        rows_per_second = len(rows) / elapsed if elapsed else 0.0
+        return DryRunReport(
+            sampled_rows=len(rows),
+            failed_rows=failed_rows,
+            rows_per_second=rows_per_second,
+            estimated_rows=estimated_rows,
+            estimated_duration_seconds=estimated_rows / rows_per_second if rows_per_second else 0.0,
+            estimated_output_size=int(len(header) + average_output_row_size * estimated_rows),
+            column_errors=column_errors,
+            first_errors=first_errors,
+            unknown_columns=[field for field in dataset_transfomer.transformed_fields if field not in self._field_names],
+            preview=self._format_rows(output_rows[:PREVIEW_ROWS]).decode(self._output_dialect.encoding),
+        )
+
+
+    def _sample_first_rows(self, sample_size: int) -> Tuple[List[Dict[str, str]], int]:
+        """Reads the first rows of the input file.
+
+        Returns:
+            Tuple[List[Dict[str, str]], int]: the sampled rows and the estimated nr. of rows of the whole file
+        """
+        file_size = os.path.getsize(self._input_file)
+        with open(self._input_file, 'r', newline='', encoding=self._input_dialect.encoding) as text_file:
+            lines = _LineReader(text_file, self._input_dialect.encoding)
+            reader = DictReader(lines, fieldnames=self._field_names, **get_csv_format_params(self._input_dialect))
+            next(lines, None)
+            header_size = lines.bytes_read
+            rows = list(islice(reader, sample_size))
+            data_size = lines.bytes_read - header_size
+            if len(rows) < sample_size or not data_size:
+                # the whole file has been read
+                return rows, len(rows)
+        return rows, round((file_size - header_size) * len(rows) / data_size)
+
+
+    def _sample_random_rows(self, sample_size: int) -> Tuple[List[Dict[str, str]], int]:
+        """Reads rows at random positions of the input file. Each position is moved forward to the
+        beginning of the next line, so the cost only depends on the sample size and not on the file size.
+        Records containing line breaks may be misread if a position falls inside them.
+        Positions are byte offsets, so the input encoding must be ASCII compatible.
+
+        A row is picked with a probability proportional to the size of the line before it, which doesn't
+        depend on its own size, so the plain mean of the sampled sizes estimates the average row size.
+
+        Returns:
+            Tuple[List[Dict[str, str]], int]: the sampled rows and the estimated nr. of rows of the whole file
+        """
+        file_size = os.path.getsize(self._input_file)
+        encoding = self._input_dialect.encoding
+        format_params = get_csv_format_params(self._input_dialect)
+        with open(self._input_file, 'rb') as binary_file:
+            binary_file.readline()
+            header_size = binary_file.tell()
+            data_size = file_size - header_size
+            if data_size <= 0:
+                return [], 0
+
+            rows = []
+            row_sizes = []
+            record_starts = set()
+            for position in sorted(random.sample(range(header_size, file_size), min(sample_size, data_size))):
+                # the byte before the position tells whether the position is already the beginning of a line
+                binary_file.seek(position - 1)
+                binary_file.readline()
+                record_start = binary_file.tell()
+                if record_start in record_starts or record_start >= file_size:
+                    continue
+                record_starts.add(record_start)
+                lines = (line.decode(encoding) for line in iter(binary_file.readline, b""))
+                row = next(DictReader(lines, fieldnames=self._field_names, **format_params), None)
+                if row is not None:
+                    rows.append(row)
+                    row_sizes.append(binary_file.tell() - record_start)
+
+        if not rows:
+            return rows, 0
+        average_row_size = sum(row_sizes) / len(row_sizes)
+        return rows, round(data_size / average_row_size)
+
+
+    def _measure_output(self, output_rows: List[Dict[str, str]]) -> Tuple[bytes, float]:
+        """Measures the size of the output header, and the average size of the transformed rows once written.
+        """
+        header = self._format_rows([])
+        if not output_rows:
+            return header, 0.0
+        return header, (len(self._format_rows(output_rows)) - len(header)) / len(output_rows)
+
+
+    def _format_rows(self, rows: List[Dict[str, str]]) -> bytes:
+        """Writes the rows as they'd be written to the output file, header included.
+        """
+        buffer = io.StringIO(newline='')
+        writer = DictWriter(buffer, fieldnames=self._column_order, **get_csv_format_params(self._output_dialect))
+        writer.writeheader()
+        writer.writerows(rows)
+        return buffer.getvalue().encode(self._output_dialect.encoding)
+
+
+def format_dry_run_report(report: DryRunReport) -> str:
+    """Formats the dry run report to be printed to the console.
+    """
+    lines = [
+        f"Sampled rows: {report.sampled_rows}",
+        f"Failed rows: {report.failed_rows}",
+    ]
+    for field, count in report.column_errors.items():
+        lines.append(f"  Column '{field}': {count} failures. First error: {report.first_errors[field]}")
+    if report.unknown_columns:
+        lines.append(f"Columns in the definition not found in the input file: {report.unknown_columns}")
+    lines += [
+        "",
+        "Preview:",
+        report.preview.rstrip(),
+        "",
+        "Projection on the whole file:",
+        f"  Estimated rows: {report.estimated_rows:,}",
+        f"  Throughput (read, transform and write): {report.rows_per_second:,.0f} rows/s",
+        f"  Estimated run time: {report.estimated_duration_seconds:,.1f} s",
+        f"  Estimated output size: {_format_size(report.estimated_output_size)}",
+        "",
+        "Definition is valid" if report.is_valid else "Definition is NOT valid",
+    ]
+    return "\n".join(lines)
+
+
+def _format_size(size: float) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            return f"{size:,.1f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} TB"
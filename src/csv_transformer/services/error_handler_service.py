@@ -0,0 +1,144 @@
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+from csv import writer as csv_writer
+
+from csv_transformer.common.constants import ErrorPolicy
+from csv_transformer.common.logger import logger
+from csv_transformer.common.utils import get_csv_format_params
+from csv_transformer.models.transformer_model import CSVDialect
+
+
+# Extra columns prepended to the original fields in the reject file. The leading underscore
+# keeps them apart from the input columns, which must not use the same names
+REJECT_FILE_EXTRA_FIELDS = ["_line_number", "_error"]
+
+
+def get_default_reject_file_path(output_file: str) -> str:
+    """
+    Builds the default path of the reject file, next to the output file.
+
+    Example:
+        >>> get_default_reject_file_path("data/output.csv")
+        'data/output_rejected.csv'
+    """
+    path = Path(output_file)
+    return str(path.with_name(f"{path.stem}_rejected{path.suffix}"))
+
+
+class ErrorHandlerService:
+    """
+    Service that applies the configured error policy to rows that fail to be transformed.
+
+    Args:
+        error_policy (ErrorPolicy): What to do with a row that fails. Defaults to ErrorPolicy.FAIL
+        max_errors (Optional[int]): Maximum nr. of failed rows tolerated before aborting the run. Unlimited if None
+        reject_file (Optional[str]): Path of the CSV file where failed rows are written when the policy is 'quarantine'
+    """
+
+    def __init__(self, error_policy: ErrorPolicy = ErrorPolicy.FAIL, max_errors: Optional[int] = None, reject_file: Optional[str] = None):
+        if max_errors is not None and max_errors < 0:
+            raise ValueError(f"'max_errors' must be zero or a positive integer. Provided: {max_errors}")
+        if error_policy == ErrorPolicy.QUARANTINE and not reject_file:
+            raise ValueError("A reject file must be provided when the error policy is 'quarantine'")
+        self._error_policy = error_policy
+        self._max_errors = max_errors
+        self._reject_file = reject_file
+        self._error_count = 0
+        self._rejected_count = 0
+        self._reject_field_names: Optional[List[str]] = None
+        self._reject_dialect = CSVDialect()
+        self._reject_csv = None
+        self._reject_writer = None
+        self._append = False
+
+    @property
+    def error_count(self) -> int:
+        return self._error_count
+
+    def open(self, field_names: List[str], dialect: Optional[CSVDialect] = None, append: bool = False) -> "ErrorHandlerService":
+        """
+        Sets the format of the reject file. The file is only created when the first row is quarantined,
+        then rows are written to it as they fail. Use the returned object as a context manager to close the file.
+
+        Args:
+            field_names (List[str]): Field names of the input file
+            dialect (Optional[CSVDialect]): csv formatting parameters of the reject file. Defaults to a comma separated UTF-8 file
+            append (bool): Append the rows to the existing reject file, without writing the header again
+
+        Raises:
+            ValueError: If the policy is 'quarantine' and an input column has the name of a reject file extra column
+        """
+        colliding_fields = [field for field in field_names if field in REJECT_FILE_EXTRA_FIELDS]
+        if self._error_policy == ErrorPolicy.QUARANTINE and colliding_fields:
+            raise ValueError(f"Input columns {colliding_fields} collide with the extra columns of the reject file {REJECT_FILE_EXTRA_FIELDS}")
+        self._append = append
+        self._reject_field_names = list(field_names)
+        self._reject_dialect = dialect or CSVDialect()
+        return self
+
+    def close(self):
+        """
+        Closes the reject file, if any row has been quarantined.
+        """
+        if self._reject_csv is not None:
+            self._reject_csv.close()
+            logger.info(f"{self._rejected_count} rejected rows written to {self._reject_file}")
+        self._reject_csv = None
+        self._reject_writer = None
+
+    def __enter__(self) -> "ErrorHandlerService":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def handle(self, row: Dict[str, str], line_number: int, error: Exception) -> Optional[Dict[str, str]]:
+        """
+        Applies the error policy to a row that failed to be transformed.
+
+        Args:
+            row (Dict[str, str]): The original row, as read from the input file
+            line_number (int): Line number of the row in the input file
+            error (Exception): The error raised while transforming the row
+
+        Returns:
+            Optional[Dict[str, str]]: The row to write to the output file, or None if the row must be dropped
+
+        Raises:
+            RuntimeError: If the policy is 'fail' or the max nr. of errors has been exceeded
+        """
+        self._error_count += 1
+        if self._error_policy == ErrorPolicy.FAIL:
+            raise RuntimeError(f"Row at line {line_number} could not be transformed: {error}")
+
+        logger.warning(f"Row at line {line_number} could not be transformed ({self._error_policy.value}): {error}")
+        if self._error_policy == ErrorPolicy.QUARANTINE:
+            self._write_rejected_row(row, line_number, error)
+
+        if self._max_errors is not None and self._error_count > self._max_errors:
+            raise RuntimeError(f"Max nr. of errors exceeded ({self._max_errors}). Aborting at line {line_number}")
+
+        if self._error_policy == ErrorPolicy.PASSTHROUGH:
+            # extra values of rows longer than the header are under the None key, and can't be written
+            return {field: value for field, value in row.items() if field is not None}
+        return None
+
+    def _write_rejected_row(self, row: Dict[str, str], line_number: int, error: Exception):
+        """
+        Writes a quarantined row to the reject file, creating it on the first row.
+        Extra values of rows longer than the header are kept as trailing columns, as in the input file.
+        The file is flushed after each row, so the rows rejected so far survive an interrupted run.
+        """
+        if self._reject_field_names is None:
+            self._reject_field_names = [field for field in row if field is not None]
+        if self._reject_writer is None:
+            append = self._append and os.path.isfile(self._reject_file) and os.path.getsize(self._reject_file) > 0
+            logger.info(f"Writing rejected rows to {self._reject_file}")
+            self._reject_csv = open(self._reject_file, 'a' if append else 'w', newline='', encoding=self._reject_dialect.encoding)
+            self._reject_writer = csv_writer(self._reject_csv, **get_csv_format_params(self._reject_dialect))
+            if not append:
+                self._reject_writer.writerow(REJECT_FILE_EXTRA_FIELDS + self._reject_field_names)
+        self._reject_writer.writerow([line_number, str(error)] + [row.get(field) for field in self._reject_field_names] + row.get(None, []))
+        self._reject_csv.flush()
+        self._rejected_count += 1
@@ -0,0 +1,154 @@
+import os
+import json
+import hashlib
+from dataclasses import asdict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from csv_transformer.common.logger import logger
+from csv_transformer.models.watermark_model import Watermark
+
+
+# Size of the chunks read when hashing or scanning the input file
+CHUNK_SIZE = 1024 * 1024
+
+
+def get_default_state_file_path(output_file: str) -> str:
+    """
+    Builds the default path of the state file, next to the output file.
+
+    Example:
+        >>> get_default_state_file_path("data/output.csv")
+        'data/output_state.json'
+    """
+    path = Path(output_file)
+    return str(path.with_name(f"{path.stem}_state.json"))
+
+
+def get_definition_hash(transformations_definition: dict) -> str:
+    """
+    Hashes the transformation definition, so that a change in the definition can be detected between runs.
+    """
+    serialized_definition = json.dumps(transformations_definition, sort_keys=True)
+    return hashlib.sha256(serialized_definition.encode()).hexdigest()
+
+
+def find_last_record_end(file_path: str, start: int = 0, quotechar: bytes = b'"') -> int:
+    """
+    Finds the offset right after the last complete record of a file, scanning forward from a record boundary.
+    A line break ends a record only if the nr. of quote chars since the start is even, otherwise it's inside
+    a quoted field. Bytes after the last record belong to a record that may still be being written,
+    so they're left to the next run.
+
+    Args:
+        file_path (str): Path of the file to scan
+        start (int): Offset of the beginning of a record, from which to scan
+        quotechar (bytes): Quote char of the file, encoded
+
+    Returns:
+        int: Offset after the last line break ending a record. `start` if the file has no complete record after it
+    """
+    record_end = start
+    in_quotes = False
+    with open(file_path, 'rb') as binary_file:
+        binary_file.seek(start)
+        position = start
+        for line in binary_file:
+            position += len(line)
+            if line.count(quotechar) % 2:
+                in_quotes = not in_quotes
+            if not in_quotes and line.endswith(b"\n"):
+                record_end = position
+    return record_end
+
+
+class IncrementalStateService:
+    """
+    Service that persists and validates the watermark of incremental runs.
+
+    Args:
+        state_file (str): Path of the JSON file where the watermark is persisted
+    """
+
+    def __init__(self, state_file: str):
+        self._state_file = state_file
+
+    def load(self) -> Optional[Watermark]:
+        """
+        Loads the watermark persisted by the previous run.
+
+        Returns:
+            Optional[Watermark]: The watermark, or None if the state file doesn't exist or is not valid
+        """
+        if not Path(self._state_file).is_file():
+            logger.info(f"State file {self._state_file} not found")
+            return None
+        try:
+            with open(self._state_file) as state_file:
+                return Watermark(**json.load(state_file))
+        except (json.JSONDecodeError, TypeError) as e:
+            logger.warning(f"State file {self._state_file} is not valid: {e}")
+            return None
+
+    def save(self, watermark: Watermark):
+        """
+        Persists the watermark. The file is replaced atomically, so an interrupted run leaves the previous state intact.
+        """
+        logger.info(f"Saving state to {self._state_file}: offset {watermark.offset}, {watermark.line_count} lines")
+        tmp_state_file = f"{self._state_file}.tmp"
+        with open(tmp_state_file, 'w') as state_file:
+            json.dump(asdict(watermark), state_file)
+        os.replace(tmp_state_file, self._state_file)
+
+    def resume(self, input_file: str, output_file: str, definition_hash: str, field_names: List[str]) -> Tuple[Optional[Watermark], "hashlib._Hash"]:
+        """
+        Loads the watermark of the previous run and checks whether the run can resume from it.
+        A full run is needed if the definition or the header changed, the output file is missing or shorter
+        than recorded, or the processed prefix of the input file has been rewritten.
+        If the output file is longer than recorded, a previous run appended rows without saving its state,
+        so the output is truncated to the recorded size before resuming.
+
+        Args:
+            input_file (str): Path of the input CSV file
+            output_file (str): Path of the output CSV file
+            definition_hash (str): Hash of the current transformation definition
+            field_names (List[str]): Field names of the input file
+
+        Returns:
+            Tuple[Optional[Watermark], hashlib._Hash]: The watermark to resume from, or None if a full run is needed,
+            and the hash of the input file prefix processed so far, to be updated with the new data
+        """
+        prefix_hasher = hashlib.sha256()
+        watermark = self.load()
+        if watermark is None:
+            return None, prefix_hasher
+
+        if watermark.definition_hash != definition_hash or watermark.field_names != list(field_names):
+            logger.warning("The transformation definition or the input header changed since the last run. Running a full transformation")
+            return None, hashlib.sha256()
+        if not Path(output_file).is_file():
+            logger.warning(f"Output file {output_file} not found. Running a full transformation")
+            return None, hashlib.sha256()
+        if os.path.getsize(output_file) < watermark.output_size:
+            logger.warning(f"Output file {output_file} is smaller than the last run. Running a full transformation")
+            return None, hashlib.sha256()
+        if os.path.getsize(input_file) < watermark.offset:
+            logger.warning(f"Input file {input_file} is smaller than the last run. Running a full transformation")
+            return None, hashlib.sha256()
+
+        with open(input_file, 'rb') as binary_file:
+            remaining = watermark.offset
+            while remaining > 0:
+                chunk = binary_file.read(min(CHUNK_SIZE, remaining))
+                prefix_hasher.update(chunk)
+                remaining -= len(chunk)
+        if prefix_hasher.hexdigest() != watermark.prefix_hash:
+            logger.warning(f"Input file {input_file} has been rewritten since the last run. Running a full transformation")
+            return None, hashlib.sha256()
+
+        if os.path.getsize(output_file) > watermark.output_size:
+            logger.warning(f"Output file {output_file} has rows not recorded in the state. Truncating it to {watermark.output_size} bytes")
+            os.truncate(output_file, watermark.output_size)
+
+        logger.info(f"Resuming from offset {watermark.offset} (line {watermark.line_count})")
+        return watermark, prefix_hasher
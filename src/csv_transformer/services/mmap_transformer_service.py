@@ -0,0 +1,170 @@
+import io
+from csv import reader as csv_reader, writer as csv_writer
+from typing import Callable, Dict, List
+
+from csv_transformer.common.constants import QuotingStyle
+from csv_transformer.common.logger import logger
+from csv_transformer.common.mmap_reader import MmapCSVReader
+from csv_transformer.common.utils import get_csv_format_params
+from csv_transformer.models.transformer_model import CSVDialect
+from csv_transformer.services.dataset_transformer_service import DatasetTransformerService
+from csv_transformer.services.error_handler_service import ErrorHandlerService
+
+
+# Size of the buffer of the output file
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def _build_field_quoter(delimiter: bytes, quotechar: bytes, quote_all: bool) -> Callable[[bytes], bytes]:
+    """
+    Builds the function that quotes an encoded field as the csv writer would, with minimal or full quoting.
+    """
+    escaped_quotechar = quotechar * 2
+    special_chars = (delimiter, quotechar, b"\r", b"\n")
+
+    def quote(field: bytes) -> bytes:
+        if quote_all or any(char in field for char in special_chars):
+            return quotechar + field.replace(quotechar, escaped_quotechar) + quotechar
+        return field
+
+    return quote
+
+
+class MmapTransformerService:
+    """Service that transforms a local CSV file by memory mapping it and working over raw bytes.
+
+    Records without quote chars and with the expected nr. of fields are split over bytes: fields that
+    are not transformed are copied to the output without being decoded, and only transformed fields
+    are materialised as `str`. All other records go through the csv module, so the output is the same
+    as the one of the default reader.
+
+    Args:
+        input_file (str): Path to the input CSV file
+        output_file (str): Path where the transformed CSV will be written
+        field_names (List[str]): Field names of the input file
+        error_handler (ErrorHandlerService): Service applying the error policy to the rows that fail
+    """
+
+    def __init__(self, input_file: str, output_file: str, field_names: List[str], error_handler: ErrorHandlerService):
+        self._input_file = input_file
+        self._output_file = output_file
+        self._field_names = field_names
+        self._error_handler = error_handler
+
+
+    def transform(self, dataset_transfomer: DatasetTransformerService, column_order: List[str],
+                  input_dialect: CSVDialect, output_dialect: CSVDialect):
+        """Transform each record of the input file and write it to the output file.
+
+        Args:
+            dataset_transfomer (DatasetTransformerService): Service to transform individual rows
+            column_order (List[str]): Field names in the order they must be written
+            input_dialect (CSVDialect): csv formatting parameters of the input file
+            output_dialect (CSVDialect): csv formatting parameters of the output file
+
+        """
+        encoding = input_dialect.encoding
+        delimiter = input_dialect.delimiter.encode(encoding)
+        quotechar = input_dialect.quotechar.encode(encoding)
+        output_delimiter = output_dialect.delimiter.encode(encoding)
+        output_quotechar = output_dialect.quotechar.encode(encoding)
+        lineterminator = output_dialect.lineterminator.encode(encoding)
+        quote_all = output_dialect.quoting == QuotingStyle.ALL.value
+        quote = _build_field_quoter(output_delimiter, output_quotechar, quote_all)
+
+        field_count = len(self._field_names)
+        # a blank line splits to a single empty field, which is a valid record only when there's more than one field
+        single_field = field_count == 1
+        field_index = {field: index for index, field in enumerate(self._field_names)}
+        order = [field_index[field] for field in column_order]
+        transformed = [(position, field_index[field], field) for position, field in enumerate(column_order)
+                       if field in dataset_transfomer.transformed_fields]
+        transformed_positions = {position for position, _, _ in transformed}
+        passthrough_positions = [position for position in range(len(order)) if position not in transformed_positions]
+        # Fields copied from the input only contain chars that need quoting if the output
+        # dialect differs from the input one
+        quote_passthrough = quote_all or output_delimiter != delimiter or output_quotechar != quotechar
+        transform_field = dataset_transfomer.transform_field
+        transform_row = dataset_transfomer.transform_row
+
+        # Records that can't be handled over bytes are parsed and written with the csv module
+        input_format_params = get_csv_format_params(input_dialect)
+        buffer = io.StringIO(newline='')
+        writer = csv_writer(buffer, **get_csv_format_params(output_dialect))
+
+        def parse_record(record: bytes) -> Dict[str, str]:
+            values = next(csv_reader([record.decode(encoding)], **input_format_params), [])
+            if not values:
+                return {}
+            # same as csv.DictReader: missing fields are None, extra values are under the None key
+            row = dict(zip(self._field_names, values))
+            for field in self._field_names[len(values):]:
+                row[field] = None
+            if len(values) > field_count:
+                row[None] = values[field_count:]
+            return row
+
+        def encode_row(row: Dict[str, str]) -> bytes:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow([row.get(field) for field in column_order])
+            return buffer.getvalue().encode(encoding)
+
+        logger.info(f"Reading file: {self._input_file} (mmap)")
+        with MmapCSVReader(self._input_file, input_dialect) as reader, \
+                open(self._output_file, 'wb', buffering=WRITE_BUFFER_SIZE) as output_csv:
+            write = output_csv.write
+            write(encode_row({field: field for field in column_order}))
+            records = reader.records()
+            line_number = 1
+            rows_count = 0
+            self._error_handler.open(self._field_names, input_dialect)
+            try:
+                logger.info("Applying transformation")
+                # Only the transformation is guarded, as in CSVTransformerService._transform_rows: errors
+                # raised while reading, decoding or writing a record abort the run.
+                for record in records:
+                    line_number += 1
+                    fields = record.rstrip(b"\r\n").split(delimiter)
+                    if len(fields) != field_count or quotechar in record or (single_field and not fields[0]):
+                        line_number += record.count(b"\n", 0, -1)
+                        row = parse_record(record)
+                        if not row:
+                            continue
+                        try:
+                            output_row = transform_row(row)
+                        except Exception as e:
+                            output_row = self._error_handler.handle(row, line_number, e)
+                            if output_row is None:
+                                continue
+                        write(encode_row(output_row))
+                        rows_count += 1
+                        continue
+
+                    output_fields = [fields[index] for index in order]
+                    try:
+                        for position, index, field in transformed:
+                            output_fields[position] = transform_field(field, fields[index].decode(encoding))
+                    except UnicodeDecodeError:
+                        raise
+                    except Exception as e:
+                        handled_row = self._error_handler.handle(parse_record(record), line_number, e)
+                        if handled_row is not None:
+                            write(encode_row(handled_row))
+                            rows_count += 1
+                        continue
+
+                    for position in transformed_positions:
+                        output_fields[position] = quote(output_fields[position].encode(encoding))
+                    if quote_passthrough:
+                        for position in passthrough_positions:
+                            output_fields[position] = quote(output_fields[position])
+                    write(output_delimiter.join(output_fields) + lineterminator)
+                    rows_count += 1
+
+                logger.info(f"{rows_count} rows processed, {self._error_handler.error_count} rows failed")
+            except Exception as e:
+                logger.error(f"Error while reading or transforming the input CSV file: {e}")
+                raise
+            finally:
+                self._error_handler.close()
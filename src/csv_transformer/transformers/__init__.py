@@ -5,4 +5,16 @@ class BaseTransformer(ABC):
     @abstractmethod
     def transform(self, value: str) -> str:
         raise NotImplementedError("Method 'transform' must be implemented")
-    
\ No newline at end of file
+
+    def get_state(self) -> dict:
+        """
+        Returns the internal state of the transformer, as a JSON serializable object.
+        Stateless transformers don't need to override it.
+        """
+        return {}
+
+    def set_state(self, state: dict):
+        """
+        Restores the internal state of the transformer from the object returned by `get_state`.
+        """
+        pass
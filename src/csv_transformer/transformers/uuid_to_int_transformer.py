@@ -32,3 +32,19 @@ class UUIDToIntTransformer(BaseTransformer):
         self._dict[value] = id
         self._initial_id += 1
         return str(id)
+
+    def get_state(self) -> dict:
+        """
+        Returns the next id to assign and the mapping between UUIDs and the ids already assigned.
+        """
+        return {
+            "next_id": self._initial_id,
+            "ids": self._dict,
+        }
+
+    def set_state(self, state: dict):
+        """
+        Restores the mapping, so that the same UUID keeps the same id across runs.
+        """
+        self._initial_id = state.get("next_id", self._initial_id)
+        self._dict = dict(state.get("ids", {}))
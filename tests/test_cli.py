@@ -1,6 +1,7 @@
+import sys
 import pytest
 from pathlib import Path
-from csv_transformer.cli import transform_csv
+from csv_transformer.cli import main, transform_csv
 from csv_transformer.common.utils import get_csv_field_names
 
 
@@ -26,4 +27,42 @@ def test_transform_csv_smoke_test(transformation_definition):
     # same field names
     assert set(input_csv_field_names) == set(output_csv_field_names)
     # same row count
-    assert count_file_lines(input_file) == count_file_lines(output_file)
\ No newline at end of file
+    assert count_file_lines(input_file) == count_file_lines(output_file)
+
+@pytest.mark.parametrize("delimiter, expected",[
+    ("\\t", "\t"),
+    (";", ";"),
+    ("§", "§"),
+    ("ü", "ü"),
+    ("€", "€"),
+    ("\\", "\\"),
+])
+def test_cli_delimiter_escape_sequences(tmp_path, monkeypatch, delimiter, expected):
+    input_file = tmp_path / "input.csv"
+    input_file.write_text(f"user_id{expected}name\n1{expected}Bob\n", encoding="utf-8")
+    output_file = tmp_path / "output.csv"
+    definition = "{\"transfomers\":{\"uuid_to_int\":[{\"column_name\":\"user_id\",\"transformer_args\":{}}]}}"
+    monkeypatch.setattr(sys, "argv", ["csv-transform", str(input_file), str(output_file), "-t", definition, "--delimiter", delimiter])
+
+    assert main() == 0
+    assert output_file.read_bytes() == b"user_id,name\r\n0,Bob\r\n"
+
+
+def test_cli_sample_zero_is_not_replaced_by_default(tmp_path, monkeypatch):
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("user_id,name\n1,Bob\n")
+    definition = "{\"transfomers\":{\"uuid_to_int\":[{\"column_name\":\"user_id\",\"transformer_args\":{}}]}}"
+    monkeypatch.setattr(sys, "argv", ["csv-transform", str(input_file), str(tmp_path / "output.csv"), "-t", definition, "--sample", "0"])
+
+    assert main() == 1
+
+
+def test_cli_backslash_escapechar(tmp_path, monkeypatch):
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("user_id,name\n1,Smith\\, Jr.\n")
+    output_file = tmp_path / "output.csv"
+    definition = "{\"transfomers\":{\"uuid_to_int\":[{\"column_name\":\"user_id\",\"transformer_args\":{}}]}}"
+    monkeypatch.setattr(sys, "argv", ["csv-transform", str(input_file), str(output_file), "-t", definition, "--escapechar", "\\"])
+
+    assert main() == 0
+    assert output_file.read_bytes() == b'user_id,name\r\n0,"Smith, Jr."\r\n'
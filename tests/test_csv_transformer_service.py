@@ -0,0 +1,347 @@
+import csv
+import random
+import pytest
+
+from csv_transformer.common.constants import ErrorPolicy, SamplingMethod
+from csv_transformer.services.csv_transformer_service import CSVTransformerService
+
+
+TRANSFORMATION_DEFINITION = {
+    "transfomers": {
+        "format_date": [{
+            "column_name": "last_login",
+            "transformer_args": {
+                "input_datetime_format": "YYYY-MM-DD",
+                "output_datetime_format": "DD/MM/YYYY"
+            }
+        }]
+    }
+}
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    file_path = tmp_path / "input.csv"
+    file_path.write_text(
+        "user_id,last_login\n"
+        "1,2025-01-01\n"
+        "2,not a date\n"
+        "3,2025-01-03\n"
+    )
+    return str(file_path)
+
+
+def read_csv(file_path) -> list:
+    with open(file_path, newline='') as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+def test_error_policy_fail(input_file, tmp_path):
+    service = CSVTransformerService(input_file, str(tmp_path / "output.csv"))
+    with pytest.raises(RuntimeError, match="line 3"):
+        service.transform(TRANSFORMATION_DEFINITION)
+
+
+def test_error_policy_skip(input_file, tmp_path):
+    output_file = tmp_path / "output.csv"
+    service = CSVTransformerService(input_file, str(output_file), ErrorPolicy.SKIP)
+    service.transform(TRANSFORMATION_DEFINITION)
+
+    rows = read_csv(output_file)
+    assert [row["user_id"] for row in rows] == ["1", "3"]
+    assert rows[1]["last_login"] == "03/01/2025"
+
+
+def test_error_policy_passthrough(input_file, tmp_path):
+    output_file = tmp_path / "output.csv"
+    service = CSVTransformerService(input_file, str(output_file), ErrorPolicy.PASSTHROUGH)
+    service.transform(TRANSFORMATION_DEFINITION)
+
+    rows = read_csv(output_file)
+    assert [row["last_login"] for row in rows] == ["01/01/2025", "not a date", "03/01/2025"]
+
+
+def test_error_policy_quarantine(input_file, tmp_path):
+    output_file = tmp_path / "output.csv"
+    service = CSVTransformerService(input_file, str(output_file), ErrorPolicy.QUARANTINE)
+    service.transform(TRANSFORMATION_DEFINITION)
+
+    assert [row["user_id"] for row in read_csv(output_file)] == ["1", "3"]
+    rejected_rows = read_csv(tmp_path / "output_rejected.csv")
+    assert len(rejected_rows) == 1
+    assert rejected_rows[0]["_line_number"] == "3"
+    assert rejected_rows[0]["last_login"] == "not a date"
+    assert rejected_rows[0]["_error"]
+
+
+def test_error_policy_quarantine_keeps_extra_values(tmp_path):
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("user_id,last_login\n1,2025-01-01\n2,bad,extra,more\n")
+    service = CSVTransformerService(str(input_file), str(tmp_path / "output.csv"), ErrorPolicy.QUARANTINE)
+    service.transform(TRANSFORMATION_DEFINITION)
+
+    with open(tmp_path / "output_rejected.csv", newline='') as csv_file:
+        rejected_rows = list(csv.reader(csv_file))
+    assert rejected_rows[0] == ["_line_number", "_error", "user_id", "last_login"]
+    assert rejected_rows[1][0] == "3"
+    assert rejected_rows[1][2:] == ["2", "bad", "extra", "more"]
+
+
+def test_error_policy_quarantine_colliding_column_names(tmp_path):
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("user_id,last_login,_error\n1,2025-01-01,x\n")
+    service = CSVTransformerService(str(input_file), str(tmp_path / "output.csv"), ErrorPolicy.QUARANTINE)
+
+    with pytest.raises(RuntimeError, match="collide with the extra columns"):
+        service.transform(TRANSFORMATION_DEFINITION)
+
+
+def test_error_policy_max_errors_exceeded(input_file, tmp_path):
+    service = CSVTransformerService(input_file, str(tmp_path / "output.csv"), ErrorPolicy.SKIP, max_errors=0)
+    with pytest.raises(RuntimeError, match="Max nr. of errors exceeded"):
+        service.transform(TRANSFORMATION_DEFINITION)
+
+
+def test_input_and_output_dialect(tmp_path):
+    input_file = tmp_path / "input.csv"
+    input_file.write_bytes("user_id;name\n1;Jos\xe9\n".encode("latin-1"))
+    output_file = tmp_path / "output.csv"
+    definition = {
+        "transfomers": {"uuid_to_int": [{"column_name": "user_id", "transformer_args": {}}]},
+        "input_dialect": {"delimiter": ";", "encoding": "latin-1"},
+        "output_dialect": {"delimiter": "\t", "quoting": "all", "lineterminator": "\n"},
+    }
+    CSVTransformerService(str(input_file), str(output_file)).transform(definition)
+
+    assert output_file.read_text(encoding="utf-8") == '"user_id"\t"name"\n"0"\t"Jos\xe9"\n'
+
+
+def test_sniff_input_dialect(tmp_path):
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("user_id|last_login\n1|2025-01-01\n2|2025-01-02\n")
+    output_file = tmp_path / "output.csv"
+    definition = {**TRANSFORMATION_DEFINITION, "input_dialect": {"sniff": True}}
+    CSVTransformerService(str(input_file), str(output_file)).transform(definition)
+
+    assert [row["last_login"] for row in read_csv(output_file)] == ["01/01/2025", "02/01/2025"]
+
+
+UUID_DEFINITION = {
+    "transfomers": {"uuid_to_int": [{"column_name": "user_id", "transformer_args": {"initial_id": 1}}]}
+}
+
+
+def test_incremental_appends_new_rows(tmp_path):
+    input_file = tmp_path / "input.csv"
+    output_file = tmp_path / "output.csv"
+    input_file.write_text("user_id,name\naaa,a\nbbb,b\n")
+    CSVTransformerService(str(input_file), str(output_file), incremental=True).transform(UUID_DEFINITION)
+
+    with open(input_file, "a") as f:
+        # 'ccc' is incomplete as it's not terminated by a line break, so it's left to the next run
+        f.write("bbb,b2\nccc,c")
+    CSVTransformerService(str(input_file), str(output_file), incremental=True).transform(UUID_DEFINITION)
+    assert [row["user_id"] for row in read_csv(output_file)] == ["1", "2", "2"]
+
+    with open(input_file, "a") as f:
+        f.write("\naaa,a2\n")
+    CSVTransformerService(str(input_file), str(output_file), incremental=True).transform(UUID_DEFINITION)
+    assert [row["user_id"] for row in read_csv(output_file)] == ["1", "2", "2", "3", "1"]
+
+
+def test_incremental_full_run_when_prefix_rewritten(tmp_path):
+    input_file = tmp_path / "input.csv"
+    output_file = tmp_path / "output.csv"
+    input_file.write_text("user_id,name\naaa,a\nbbb,b\n")
+    CSVTransformerService(str(input_file), str(output_file), incremental=True).transform(UUID_DEFINITION)
+
+    input_file.write_text("user_id,name\nzzz,z\nbbb,b\nccc,c\n")
+    CSVTransformerService(str(input_file), str(output_file), incremental=True).transform(UUID_DEFINITION)
+    assert [row["user_id"] for row in read_csv(output_file)] == ["1", "2", "3"]
+
+
+def test_incremental_leaves_multi_line_record_being_written_to_next_run(tmp_path):
+    input_file = tmp_path / "input.csv"
+    output_file = tmp_path / "output.csv"
+    input_file.write_text('user_id,name\naaa,a\nbbb,"multi\nli')
+    CSVTransformerService(str(input_file), str(output_file), incremental=True).transform(UUID_DEFINITION)
+    assert [row["user_id"] for row in read_csv(output_file)] == ["1"]
+
+    with open(input_file, "a") as f:
+        f.write('ne"\nccc,c\n')
+    CSVTransformerService(str(input_file), str(output_file), incremental=True).transform(UUID_DEFINITION)
+    assert read_csv(output_file) == [
+        {"user_id": "1", "name": "a"},
+        {"user_id": "2", "name": "multi\nline"},
+        {"user_id": "3", "name": "c"},
+    ]
+
+
+def test_incremental_header_being_written_is_read_again(tmp_path):
+    input_file = tmp_path / "input.csv"
+    output_file = tmp_path / "output.csv"
+    input_file.write_text("user_id,name")
+    CSVTransformerService(str(input_file), str(output_file), incremental=True).transform(UUID_DEFINITION)
+
+    with open(input_file, "a") as f:
+        f.write("\naaa,a\n")
+    CSVTransformerService(str(input_file), str(output_file), incremental=True).transform(UUID_DEFINITION)
+    assert read_csv(output_file) == [{"user_id": "1", "name": "a"}]
+
+
+def test_incremental_warns_about_incomplete_last_line(tmp_path, caplog):
+    input_file = tmp_path / "input.csv"
+    output_file = tmp_path / "output.csv"
+    input_file.write_text("user_id,name\naaa,a\nbbb,b")
+    CSVTransformerService(str(input_file), str(output_file), incremental=True).transform(UUID_DEFINITION)
+
+    assert [row["user_id"] for row in read_csv(output_file)] == ["1"]
+    assert "The last 5 bytes" in caplog.text
+
+
+def test_incremental_non_ascii_compatible_encoding(tmp_path):
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("user_id,name\naaa,a\n", encoding="utf-16")
+    definition = {**UUID_DEFINITION, "input_dialect": {"encoding": "utf-16"}}
+
+    with pytest.raises(RuntimeError, match="ASCII compatible"):
+        CSVTransformerService(str(input_file), str(tmp_path / "output.csv"), incremental=True).transform(definition)
+
+
+def test_incremental_truncates_output_not_recorded_in_state(tmp_path):
+    input_file = tmp_path / "input.csv"
+    output_file = tmp_path / "output.csv"
+    input_file.write_text("user_id,name\naaa,a\nbbb,b\n")
+    CSVTransformerService(str(input_file), str(output_file), incremental=True).transform(UUID_DEFINITION)
+
+    # a run interrupted after appending its rows, but before saving the state
+    with open(output_file, "a", newline="") as f:
+        f.write("3,c\r\n")
+    with open(input_file, "a") as f:
+        f.write("ccc,c\n")
+    CSVTransformerService(str(input_file), str(output_file), incremental=True).transform(UUID_DEFINITION)
+    assert [row["user_id"] for row in read_csv(output_file)] == ["1", "2", "3"]
+
+
+def test_incremental_full_run_when_output_shrank(tmp_path):
+    input_file = tmp_path / "input.csv"
+    output_file = tmp_path / "output.csv"
+    input_file.write_text("user_id,name\naaa,a\nbbb,b\n")
+    CSVTransformerService(str(input_file), str(output_file), incremental=True).transform(UUID_DEFINITION)
+
+    output_file.write_text("user_id,name\n")
+    CSVTransformerService(str(input_file), str(output_file), incremental=True).transform(UUID_DEFINITION)
+    assert [row["user_id"] for row in read_csv(output_file)] == ["1", "2"]
+
+
+def test_incremental_line_numbers_of_rejected_rows(input_file, tmp_path):
+    output_file = tmp_path / "output.csv"
+    service = CSVTransformerService(input_file, str(output_file), ErrorPolicy.QUARANTINE, incremental=True)
+    service.transform(TRANSFORMATION_DEFINITION)
+    assert [row["_line_number"] for row in read_csv(tmp_path / "output_rejected.csv")] == ["3"]
+
+    with open(input_file, "a") as f:
+        f.write("4,2025-01-04\n5,not a date\n")
+    service = CSVTransformerService(input_file, str(output_file), ErrorPolicy.QUARANTINE, incremental=True)
+    service.transform(TRANSFORMATION_DEFINITION)
+    # rows quarantined by the previous runs are kept
+    assert [row["_line_number"] for row in read_csv(tmp_path / "output_rejected.csv")] == ["3", "6"]
+    assert [row["user_id"] for row in read_csv(output_file)] == ["1", "3", "4"]
+
+
+def test_dry_run_reports_failing_columns(input_file, tmp_path):
+    output_file = tmp_path / "output.csv"
+    report = CSVTransformerService(input_file, str(output_file)).dry_run(TRANSFORMATION_DEFINITION, 10)
+
+    assert not output_file.exists()
+    assert not report.is_valid
+    assert report.sampled_rows == 3
+    assert report.estimated_rows == 3
+    assert report.failed_rows == 1
+    assert report.column_errors == {"last_login": 1}
+    assert "not a date" in report.first_errors["last_login"]
+    assert report.preview.splitlines() == ["user_id,last_login", "1,01/01/2025", "3,03/01/2025"]
+
+
+def test_dry_run_reports_unknown_columns(input_file, tmp_path):
+    definition = {"transfomers": {"redact_data": [{"column_name": "email", "transformer_args": {}}]}}
+    report = CSVTransformerService(input_file, str(tmp_path / "output.csv")).dry_run(definition, 10)
+
+    assert not report.is_valid
+    assert report.unknown_columns == ["email"]
+
+
+@pytest.mark.parametrize("sampling", list(SamplingMethod))
+def test_dry_run_projection(sampling, tmp_path):
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("user_id,last_login\n" + "".join(f"{i:05},2025-01-01\n" for i in range(10000)))
+    definition = {"transfomers": {"uuid_to_int": [{"column_name": "user_id", "transformer_args": {}}]}}
+    report = CSVTransformerService(str(input_file), str(tmp_path / "output.csv")).dry_run(definition, 100, sampling)
+
+    assert report.is_valid
+    assert 0 < report.sampled_rows <= 100
+    assert report.estimated_rows == 10000
+    assert report.rows_per_second > 0
+    assert report.estimated_output_size > 0
+
+
+def test_dry_run_random_projection_with_variable_row_sizes(tmp_path):
+    input_file = tmp_path / "input.csv"
+    rows_generator = random.Random(0)
+    input_file.write_text("user_id,name\n" + "".join(
+        f"{i:05},{'x' * (200 if rows_generator.random() < 0.2 else 2)}\n" for i in range(20000)
+    ))
+    definition = {"transfomers": {"uuid_to_int": [{"column_name": "user_id", "transformer_args": {}}]}}
+    random.seed(0)
+    report = CSVTransformerService(str(input_file), str(tmp_path / "output.csv")).dry_run(definition, 1000, SamplingMethod.RANDOM)
+
+    assert report.estimated_rows == pytest.approx(20000, rel=0.1)
+
+
+def test_dry_run_non_ascii_compatible_encoding(tmp_path):
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("user_id,last_login\n" + "".join(f"{i:05},2025-01-01\n" for i in range(100)), encoding="utf-16")
+    definition = {
+        "transfomers": {"uuid_to_int": [{"column_name": "user_id", "transformer_args": {}}]},
+        "input_dialect": {"encoding": "utf-16"},
+    }
+    service = CSVTransformerService(str(input_file), str(tmp_path / "output.csv"))
+    report = service.dry_run(definition, 10)
+
+    assert report.is_valid
+    assert report.estimated_rows == 100
+    with pytest.raises(ValueError, match="ASCII compatible"):
+        service.dry_run(definition, 10, SamplingMethod.RANDOM)
+
+
+def test_error_policy_passthrough_drops_extra_values(tmp_path):
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("user_id,last_login\n1,2025-01-01\n2,bad,extra\n")
+    output_file = tmp_path / "output.csv"
+    service = CSVTransformerService(str(input_file), str(output_file), ErrorPolicy.PASSTHROUGH)
+    service.transform(TRANSFORMATION_DEFINITION)
+
+    assert output_file.read_bytes() == b"user_id,last_login\r\n1,01/01/2025\r\n2,bad\r\n"
+
+
+@pytest.mark.parametrize("error_policy", [ErrorPolicy.SKIP, ErrorPolicy.QUARANTINE, ErrorPolicy.PASSTHROUGH])
+def test_reader_errors_are_not_handled_as_row_failures(tmp_path, error_policy):
+    input_file = tmp_path / "input.csv"
+    rows = [f"{i},2025-01-01\n".encode() for i in range(3000)]
+    rows[2000] = b"\xff,2025-01-01\n"
+    input_file.write_bytes(b"user_id,last_login\n" + b"".join(rows))
+    service = CSVTransformerService(str(input_file), str(tmp_path / "output.csv"), error_policy)
+
+    with pytest.raises(RuntimeError, match="codec can't decode"):
+        service.transform(TRANSFORMATION_DEFINITION)
+    assert not (tmp_path / "output_rejected.csv").exists()
+
+
+def test_rejected_rows_are_written_before_aborting(tmp_path):
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("user_id,last_login\n1,bad\n2,bad\n3,bad\n")
+    service = CSVTransformerService(str(input_file), str(tmp_path / "output.csv"), ErrorPolicy.QUARANTINE, max_errors=1)
+
+    with pytest.raises(RuntimeError, match="Max nr. of errors exceeded"):
+        service.transform(TRANSFORMATION_DEFINITION)
+    assert [row["user_id"] for row in read_csv(tmp_path / "output_rejected.csv")] == ["1", "2"]
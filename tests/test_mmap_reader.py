@@ -0,0 +1,112 @@
+import pytest
+
+from csv_transformer.common.constants import ErrorPolicy, ReaderBackend
+from csv_transformer.common.mmap_reader import MmapCSVReader
+from csv_transformer.models.transformer_model import CSVDialect
+from csv_transformer.services.csv_transformer_service import CSVTransformerService
+
+
+CSV_CONTENT = (
+    'user_id,name,last_login\r\n'
+    'aaa,Bob,2025-01-01\r\n'
+    'bbb,"Smith, Jr.",2025-01-02\r\n'
+    '\r\n'
+    'ccc,"multi\nline ""name""",2025-01-03\r\n'
+    'aaa,short row\r\n'
+    'ddd,Alice,2025-01-04\r\n'
+)
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    file_path = tmp_path / "input.csv"
+    file_path.write_bytes(CSV_CONTENT.encode())
+    return str(file_path)
+
+
+def test_records(input_file):
+    with MmapCSVReader(input_file, CSVDialect()) as reader:
+        records = list(reader.records())
+
+    assert records == [
+        b'aaa,Bob,2025-01-01\r\n',
+        b'bbb,"Smith, Jr.",2025-01-02\r\n',
+        b'\r\n',
+        b'ccc,"multi\nline ""name""",2025-01-03\r\n',
+        b'aaa,short row\r\n',
+        b'ddd,Alice,2025-01-04\r\n',
+    ]
+
+
+@pytest.mark.parametrize("splits", [1, 2, 3, 10])
+def test_split_points(tmp_path, splits):
+    file_path = tmp_path / "input.csv"
+    file_path.write_text("id,value\n" + "".join(f"{i},{'x' * (i % 7)}\n" for i in range(100)))
+    with MmapCSVReader(str(file_path), CSVDialect()) as reader:
+        points = reader.split_points(splits)
+        records = [record for start, end in zip(points, points[1:]) for record in reader.records(start, end)]
+
+    assert len(points) == splits + 1
+    assert records == [f"{i},{'x' * (i % 7)}\n".encode() for i in range(100)]
+
+
+@pytest.mark.parametrize("splits", [2, 4, 7])
+def test_split_points_skip_quoted_line_breaks(tmp_path, splits):
+    file_path = tmp_path / "input.csv"
+    file_path.write_text("id,value\n" + "".join(f'{i},"first line\nsecond ""line""\nthird line"\n' for i in range(50)))
+    with MmapCSVReader(str(file_path), CSVDialect()) as reader:
+        expected_records = list(reader.records())
+        points = reader.split_points(splits)
+        records = [record for start, end in zip(points, points[1:]) for record in reader.records(start, end)]
+
+    assert len(expected_records) == 50
+    assert records == expected_records
+
+
+@pytest.mark.parametrize("definition",[
+    {"transfomers": {"uuid_to_int": [{"column_name": "user_id", "transformer_args": {}}]}},
+    {
+        "transfomers": {"uuid_to_int": [{"column_name": "user_id", "transformer_args": {}}]},
+        "column_order": ["name", "last_login", "user_id"],
+        "output_dialect": {"delimiter": " ", "quoting": "all", "lineterminator": "\n"},
+    },
+])
+def test_mmap_reader_output_matches_csv_reader(input_file, tmp_path, definition):
+    csv_output_file = tmp_path / "csv_output.csv"
+    mmap_output_file = tmp_path / "mmap_output.csv"
+    CSVTransformerService(input_file, str(csv_output_file)).transform(definition)
+    CSVTransformerService(input_file, str(mmap_output_file), reader_backend=ReaderBackend.MMAP).transform(definition)
+
+    assert mmap_output_file.read_bytes() == csv_output_file.read_bytes()
+
+
+def test_mmap_reader_quarantine(input_file, tmp_path):
+    definition = {
+        "transfomers": {"format_date": [{"column_name": "last_login", "transformer_args": {}}]}
+    }
+    csv_output_file = tmp_path / "csv_output.csv"
+    mmap_output_file = tmp_path / "mmap_output.csv"
+    CSVTransformerService(input_file, str(csv_output_file), ErrorPolicy.QUARANTINE).transform(definition)
+    csv_rejected_rows = (tmp_path / "csv_output_rejected.csv").read_bytes()
+    CSVTransformerService(input_file, str(mmap_output_file), ErrorPolicy.QUARANTINE,
+                          reader_backend=ReaderBackend.MMAP).transform(definition)
+
+    assert mmap_output_file.read_bytes() == csv_output_file.read_bytes()
+    assert (tmp_path / "mmap_output_rejected.csv").read_bytes() == csv_rejected_rows
+
+
+@pytest.mark.parametrize("error_policy", [ErrorPolicy.SKIP, ErrorPolicy.QUARANTINE, ErrorPolicy.PASSTHROUGH])
+def test_mmap_reader_decode_errors_are_not_handled_as_row_failures(tmp_path, error_policy):
+    definition = {
+        "transfomers": {"format_date": [{"column_name": "last_login", "transformer_args": {}}]}
+    }
+    input_file = tmp_path / "input.csv"
+    rows = [f"{i},2025-01-01\n".encode() for i in range(3000)]
+    rows[2000] = b"2000,\xff\n"
+    input_file.write_bytes(b"user_id,last_login\n" + b"".join(rows))
+    service = CSVTransformerService(str(input_file), str(tmp_path / "output.csv"), error_policy,
+                                    reader_backend=ReaderBackend.MMAP)
+
+    with pytest.raises(RuntimeError, match="codec can't decode"):
+        service.transform(definition)
+    assert not (tmp_path / "output_rejected.csv").exists()
@@ -1,4 +1,6 @@
+import pytest
 from csv_transformer.common.parsers import TransformerArgsParser
+from csv_transformer.models.transformer_model import CSVDialect
 
 
 def test_parse_deserializes_correctly():
@@ -42,4 +44,39 @@ def test_parse_deserializes_correctly():
         ]
     }
     transformation = TransformerArgsParser.parse(payload)
-    assert transformation
\ No newline at end of file
+    assert transformation
+
+def test_parse_dialect_defaults():
+    transformation = TransformerArgsParser.parse({
+        "transfomers": {"redact_data": [{"column_name": "name", "transformer_args": {}}]}
+    })
+    assert transformation.input_dialect == CSVDialect()
+    assert transformation.output_dialect == CSVDialect()
+
+
+def test_parse_dialect():
+    dialect = TransformerArgsParser.parse_dialect({"delimiter": ";", "quoting": "all", "encoding": "latin-1"})
+    assert dialect == CSVDialect(delimiter=";", quoting="all", encoding="latin-1")
+
+
+@pytest.mark.parametrize("dialect_definition",[
+    {"separator": ";"},
+    {"quoting": "sometimes"},
+    [";"],
+])
+def test_parse_dialect_invalid(dialect_definition):
+    with pytest.raises(ValueError):
+        TransformerArgsParser.parse_dialect(dialect_definition)
+
+
+def test_parse_input_dialect_nonnumeric_quoting():
+    definition = {
+        "transfomers": {"uuid_to_int": [{"column_name": "user_id", "transformer_args": {}}]},
+        "input_dialect": {"quoting": "nonnumeric"},
+        "output_dialect": {"quoting": "nonnumeric"},
+    }
+    with pytest.raises(ValueError, match="input_dialect.quoting"):
+        TransformerArgsParser.parse(definition)
+
+    del definition["input_dialect"]
+    assert TransformerArgsParser.parse(definition).output_dialect.quoting == "nonnumeric"